@@ -0,0 +1,139 @@
+"""Check that the peak memory used by the streaming pipeline doesn't grow with the number of strands.
+
+Synthetic corpora of JSON schemas are written to a temporary directory and published through the pipeline against a
+transport that answers every request without keeping anything, so the only memory that could grow with the number of
+strands is the pipeline's own. The peak traced memory for each corpus size is printed, along with the peak for loading
+every schema up front for comparison. The script exits with an exit code of 1 if the pipeline's peak memory for the
+largest corpus is more than 25% higher than for the smallest.
+
+Usage: python benchmarks/pipeline_memory.py [number of schemas ...] (default: 1000 10000)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+from gql.transport.transport import Transport
+from graphql import ExecutionResult
+from graphql.utilities import get_operation_ast
+
+from publish_strand_version import api
+from publish_strand_version.pipeline import run_pipeline
+from publish_strand_version.plan import _load_schema
+
+MAXIMUM_GROWTH = 1.25
+
+
+class ForgetfulTransport(Transport):
+    """A transport that treats every schema as the first version of a new strand and doesn't keep anything."""
+
+    def execute(self, document, variable_values=None, operation_name=None, **kwargs):
+        operation = get_operation_ast(document, operation_name).name.value
+
+        if operation == "suggestSemVerViaToken":
+            data = {"suggestedVersion": "0.1.0", "change": "INITIAL", "latestVersion": None, "stableVersion": None}
+        else:
+            data = {"uuid": str(uuid.uuid4())}
+
+        return ExecutionResult(data={operation: data})
+
+
+def write_corpus(directory, number_of_schemas):
+    """Write a corpus of synthetic JSON schemas, each around 10kB.
+
+    :param str directory: the directory to write the schemas to
+    :param int number_of_schemas: the number of schemas to write
+    :return None:
+    """
+    for i in range(number_of_schemas):
+        json_schema = {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "title": f"Schema {i}",
+            "properties": {f"property_{j}": {"type": "number", "description": "x" * 100} for j in range(80)},
+            "required": [f"property_{j}" for j in range(0, 80, 2)],
+        }
+
+        with open(os.path.join(directory, f"schema-{i}.json"), "w") as f:
+            json.dump(json_schema, f)
+
+
+def iter_strands(directory, number_of_schemas):
+    """Generate the strands for a corpus without holding them all in memory.
+
+    :param str directory: the directory containing the corpus
+    :param int number_of_schemas: the number of schemas in the corpus
+    :return iter(dict): the strands
+    """
+    for i in range(number_of_schemas):
+        yield {"account": "benchmark", "name": f"strand-{i}", "path": os.path.join(directory, f"schema-{i}.json")}
+
+
+def measure_pipeline(directory, number_of_schemas):
+    """Get the peak traced memory while running the pipeline over a corpus.
+
+    :param str directory: the directory containing the corpus
+    :param int number_of_schemas: the number of schemas in the corpus
+    :return int: the peak traced memory in bytes
+    """
+    tracemalloc.start()
+
+    run_pipeline(
+        token="benchmark-token",
+        strands=iter_strands(directory, number_of_schemas),
+        output_path=os.path.join(directory, "results.jsonl"),
+    )
+
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def measure_loading_up_front(directory, number_of_schemas):
+    """Get the peak traced memory while loading and serialising every schema in a corpus before publishing any of them.
+
+    :param str directory: the directory containing the corpus
+    :param int number_of_schemas: the number of schemas in the corpus
+    :return int: the peak traced memory in bytes
+    """
+    tracemalloc.start()
+    loaded = [
+        (schema := _load_schema(strand["path"]), json.dumps(schema))
+        for strand in iter_strands(directory, number_of_schemas)
+    ]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del loaded
+    return peak
+
+
+def main(argv=None):
+    sizes = [int(size) for size in (argv or sys.argv[1:] or ["1000", "10000"])]
+    api.set_transport(ForgetfulTransport())
+    peaks = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, max(sizes))
+
+        for size in sizes:
+            peak = measure_pipeline(directory, size)
+            peaks.append(peak)
+            up_front_peak = measure_loading_up_front(directory, size)
+
+            print(
+                f"{size:>7} schemas: pipeline peak {peak / 1e6:8.2f} MB | "
+                f"loading everything up front {up_front_peak / 1e6:8.2f} MB"
+            )
+
+    growth = peaks[-1] / peaks[0]
+    print(f"Pipeline peak memory growth from {sizes[0]} to {sizes[-1]} schemas: {growth:.2f}x")
+
+    if growth > MAXIMUM_GROWTH:
+        print(f"FAILED: peak memory grew by more than {MAXIMUM_GROWTH}x.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
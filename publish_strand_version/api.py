@@ -3,18 +3,33 @@ import logging
 import os
 
 import gql
-from gql.transport.requests import RequestsHTTPTransport
 import semver
 
 from publish_strand_version.exceptions import StrandsException
+from publish_strand_version.transports import make_transport
 
 STRANDS_API_URL = os.environ.get("STRANDS_API_URL", "https://api.strands.octue.com/graphql/")
 STRANDS_FRONTEND_URL = os.environ.get("STRANDS_FRONTEND_URL", "https://strands.octue.com")
 STRANDS_SCHEMA_REGISTRY_URL = os.environ.get("STRANDS_SCHEMA_REGISTRY_URL", "https://jsonschema.registry.octue.com")
+STRANDS_TRANSPORT_MODE = os.environ.get("STRANDS_TRANSPORT_MODE", "live")
+STRANDS_CASSETTE_PATH = os.environ.get("STRANDS_CASSETTE_PATH")
 
 logger = logging.getLogger(__name__)
-transport = RequestsHTTPTransport(url=STRANDS_API_URL)
-client = gql.Client(transport=transport, fetch_schema_from_transport=True)
+transport = make_transport(STRANDS_TRANSPORT_MODE, url=STRANDS_API_URL, cassette_path=STRANDS_CASSETTE_PATH)
+client = gql.Client(transport=transport, fetch_schema_from_transport=STRANDS_TRANSPORT_MODE in {"live", "record"})
+
+
+def set_transport(new_transport, fetch_schema_from_transport=False):
+    """Send all subsequent requests to the Strands API through the given transport (e.g. a
+    `publish_strand_version.transports.ReplayTransport` or `FakeStrandsTransport` for testing).
+
+    :param gql.transport.transport.Transport new_transport: the transport to use
+    :param bool fetch_schema_from_transport: if `True`, fetch the GraphQL schema through the transport and validate requests against it
+    :return None:
+    """
+    global transport, client
+    transport = new_transport
+    client = gql.Client(transport=transport, fetch_schema_from_transport=fetch_schema_from_transport)
 
 
 def publish_strand_version(
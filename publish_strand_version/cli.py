@@ -8,7 +8,10 @@ import sys
 from gql.transport.requests import log as requests_logger
 
 from publish_strand_version.api import publish_strand_version
+from publish_strand_version.dependencies import DEFAULT_INDEX_PATH, filter_affected_strands
 from publish_strand_version.exceptions import StrandsException
+from publish_strand_version.pipeline import DEFAULT_QUEUE_SIZE, run_pipeline
+from publish_strand_version.plan import apply_plan, plan_strand_versions, read_plan, write_plan
 
 logging.basicConfig(
     stream=sys.stdout,
@@ -29,6 +32,12 @@ def main(argv=None):
 
     :return None:
     """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser()
     parser.add_argument("token")
     parser.add_argument("account")
@@ -119,5 +128,161 @@ def main(argv=None):
     sys.exit(0)
 
 
+def plan(argv):
+    """Get the suggested semantic versions for one or more strands and write them to a plan file without publishing
+    anything. If changed files are given, only the strands whose schemas are, or depend through `$ref`s on, those files
+    are included. If this succeeds, exit successfully with an exit code of 0; if it doesn't, exit with an exit code of 1.
+
+    :param list(str) argv: the command line arguments for the `plan` command
+    :return None:
+    """
+    parser = argparse.ArgumentParser(prog="publish-strand-version plan")
+    parser.add_argument("token")
+    parser.add_argument("plan_path")
+    parser.add_argument("strands", nargs="+", metavar="account/name=path")
+    parser.add_argument("--allow-beta", default="true")
+    parser.add_argument("--changed", nargs="+", metavar="path", help="Only plan for strands affected by these files.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="The path of the dependency index file.")
+    args = parser.parse_args(argv)
+
+    requests_logger.setLevel(logging.WARNING)
+    strands = [_parse_strand(strand, parser) for strand in args.strands]
+
+    if args.changed is not None:
+        strands = filter_affected_strands(strands, changed_paths=args.changed, index_path=args.index)
+
+    try:
+        strand_plan = plan_strand_versions(
+            token=args.token,
+            strands=strands,
+            allow_beta=args.allow_beta.lower() == "true",
+        )
+    except (StrandsException, OSError, ValueError) as e:
+        print(f"{RED}STRAND VERSION PLANNING FAILED.{NO_COLOUR}", file=sys.stderr)
+        logger.exception(e)
+        sys.exit(1)
+
+    write_plan(strand_plan, args.plan_path)
+
+    lines = [f"{GREEN}STRAND VERSION PLANNING SUCCEEDED{NO_COLOUR}"]
+
+    for entry in strand_plan["strands"]:
+        action = "publish" if entry["publish"] else "skip"
+        lines.append(f"- {entry['account']}/{entry['name']}: {entry['version']} ({entry['change']}, {action})")
+
+    print("\n".join(lines) + "\n")
+    sys.exit(0)
+
+
+def apply(argv):
+    """Publish the strand versions recorded in a plan file without requesting any further version suggestions. If this
+    succeeds, exit successfully with an exit code of 0; if it doesn't (including if the plan is stale), exit with an
+    exit code of 1.
+
+    :param list(str) argv: the command line arguments for the `apply` command
+    :return None:
+    """
+    parser = argparse.ArgumentParser(prog="publish-strand-version apply")
+    parser.add_argument("token")
+    parser.add_argument("plan_path")
+    args = parser.parse_args(argv)
+
+    requests_logger.setLevel(logging.WARNING)
+
+    try:
+        results = apply_plan(token=args.token, plan=read_plan(args.plan_path))
+    except StrandsException as e:
+        print(f"{RED}STRAND VERSION APPLYING FAILED.{NO_COLOUR}", file=sys.stderr)
+        logger.exception(e)
+        sys.exit(1)
+
+    lines = [f"{GREEN}STRAND VERSION APPLYING SUCCEEDED{NO_COLOUR}"]
+
+    for strand_url, strand_version_url, _, version, published, change, _, _ in results:
+        status = "published" if published else "skipped"
+        lines.append(f"- {strand_url}: {version} ({change}, {status}) {strand_version_url}".rstrip())
+
+    print("\n".join(lines) + "\n")
+    sys.exit(0)
+
+
+def run(argv):
+    """Publish new strand versions (or just suggest their semantic versions) for any number of strands, streaming a
+    result for each strand to a JSON Lines file. Strands can be listed in a file (one per line) and passed as
+    `@path/to/file`. If changed files are given, only the strands whose schemas are, or depend through `$ref`s on, those
+    files are included. Exit with an exit code of 0 if every strand succeeds and 1 otherwise.
+
+    :param list(str) argv: the command line arguments for the `run` command
+    :return None:
+    """
+    parser = argparse.ArgumentParser(prog="publish-strand-version run", fromfile_prefix_chars="@")
+    parser.add_argument("token")
+    parser.add_argument("output_path")
+    parser.add_argument("strands", nargs="+", metavar="account/name=path")
+    parser.add_argument("--allow-beta", default="true")
+    parser.add_argument("--suggest-only", default="false")
+    parser.add_argument("--changed", nargs="+", metavar="path", help="Only run for strands affected by these files.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="The path of the dependency index file.")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    args = parser.parse_args(argv)
+
+    requests_logger.setLevel(logging.WARNING)
+
+    if args.suggest_only.lower() == "true":
+        suggest_only = True
+        mode = "SUGGESTION"
+    else:
+        suggest_only = False
+        mode = "PUBLISHING"
+
+    strands = [_parse_strand(strand, parser) for strand in args.strands]
+
+    if args.changed is not None:
+        strands = filter_affected_strands(strands, changed_paths=args.changed, index_path=args.index)
+
+    summary = run_pipeline(
+        token=args.token,
+        strands=strands,
+        output_path=args.output_path,
+        allow_beta=args.allow_beta.lower() == "true",
+        suggest_only=suggest_only,
+        queue_size=args.queue_size,
+    )
+
+    details = (
+        f"- Published: {summary['published']}\n"
+        f"- Skipped: {summary['skipped']}\n"
+        f"- Failed: {summary['failed']}\n"
+        f"- Results: {args.output_path}\n"
+    )
+
+    if summary["failed"]:
+        print(f"{RED}STRAND VERSION {mode} FAILED.{NO_COLOUR}\n{details}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{GREEN}STRAND VERSION {mode} SUCCEEDED{NO_COLOUR}\n{details}")
+    sys.exit(0)
+
+
+def _parse_strand(strand, parser):
+    """Parse a strand given on the command line in the form `account/name=path`, exiting with a usage error if it's
+    malformed.
+
+    :param str strand: the strand specification
+    :param argparse.ArgumentParser parser: the parser to report a malformed strand specification with
+    :return dict: the strand as a dictionary with `account`, `name`, and `path` keys
+    """
+    suid, _, path = strand.partition("=")
+    account, _, name = suid.partition("/")
+
+    if not (account and name and path):
+        parser.error(f"invalid strand {strand!r} (expected the form 'account/name=path')")
+
+    return {"account": account, "name": name, "path": path}
+
+
+COMMANDS = {"plan": plan, "apply": apply, "run": run}
+
+
 if __name__ == "__main__":
     main()
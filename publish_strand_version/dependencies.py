@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+
+INDEX_FORMAT_VERSION = 2
+DEFAULT_INDEX_PATH = ".strands-dependency-index.json"
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyIndex:
+    """A persistent index of the local files each strand's JSON schema depends on through `$ref`s, used to work out
+    which strands are affected by changes to shared sub-schemas. Files are only re-read when their modification time or
+    size has changed, and only re-parsed when their content hash has changed too. Files are keyed by their absolute
+    paths, so relative paths given to any method are resolved against the current working directory.
+
+    :param str path: the path of the index file (it's loaded if it already exists)
+    :return None:
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.files = {}
+        self.strands = {}
+        self._dependents = None
+
+        if os.path.exists(path):
+            with open(path) as f:
+                index = json.load(f)
+
+            if index.get("format_version") == INDEX_FORMAT_VERSION:
+                self.files = index["files"]
+                self.strands = index["strands"]
+            else:
+                logger.warning("Ignoring dependency index %r with an unsupported format version.", path)
+
+    def update(self, strands):
+        """Update the index for the given strands, replacing any strands previously in it. Only files that have changed
+        since the last update are parsed again.
+
+        :param iter(dict) strands: the strands to index, each as a dictionary with `account`, `name`, and `path` keys
+        :return None:
+        """
+        self.strands = {f"{strand['account']}/{strand['name']}": os.path.abspath(strand["path"]) for strand in strands}
+        files = {}
+        to_visit = list(self.strands.values())
+
+        while to_visit:
+            path = to_visit.pop()
+
+            if path in files:
+                continue
+
+            files[path] = self._index_file(path)
+            to_visit.extend(files[path]["refs"])
+
+        self.files = files
+        self._dependents = None
+
+    def get_dependencies(self, path):
+        """Get every local file the given file depends on, directly or indirectly, through `$ref`s.
+
+        :param str path: the path of the file
+        :return set(str): the absolute paths of the files it depends on
+        """
+        dependencies = set()
+        to_visit = list(self.files.get(os.path.abspath(path), {}).get("refs", []))
+
+        while to_visit:
+            dependency = to_visit.pop()
+
+            if dependency in dependencies:
+                continue
+
+            dependencies.add(dependency)
+            to_visit.extend(self.files.get(dependency, {}).get("refs", []))
+
+        return dependencies
+
+    def get_affected_strands(self, changed_paths):
+        """Get the strands whose schemas are, or depend on, any of the given files.
+
+        :param iter(str) changed_paths: the paths of the changed files
+        :return list(str): the sorted strand unique identifiers (SUIDs) of the affected strands
+        """
+        if self._dependents is None:
+            self._dependents = {}
+
+            for path, file in self.files.items():
+                for ref in file["refs"]:
+                    self._dependents.setdefault(ref, set()).add(path)
+
+        affected_paths = set()
+        to_visit = [os.path.abspath(path) for path in changed_paths]
+
+        while to_visit:
+            path = to_visit.pop()
+
+            if path in affected_paths:
+                continue
+
+            affected_paths.add(path)
+            to_visit.extend(self._dependents.get(path, ()))
+
+        return sorted(suid for suid, path in self.strands.items() if path in affected_paths)
+
+    def save(self):
+        """Write the index to its file.
+
+        :return None:
+        """
+        with open(self.path, "w") as f:
+            json.dump({"format_version": INDEX_FORMAT_VERSION, "files": self.files, "strands": self.strands}, f)
+
+    def _index_file(self, path):
+        """Get the index entry for a file, reusing its existing entry if the file hasn't changed.
+
+        :param str path: the path of the file
+        :return dict: the entry, with `mtime_ns`, `size`, `sha256`, and `refs` keys
+        """
+        previous = self.files.get(path)
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            logger.warning("Referenced file %r doesn't exist.", path)
+            return {"mtime_ns": None, "size": None, "sha256": None, "refs": []}
+
+        if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+            return previous
+
+        with open(path, "rb") as f:
+            content = f.read()
+
+        sha256 = hashlib.sha256(content).hexdigest()
+
+        if previous and previous["sha256"] == sha256:
+            refs = previous["refs"]
+        else:
+            try:
+                refs = sorted(_get_local_refs(json.loads(content), os.path.dirname(path)))
+            except ValueError:
+                logger.warning("File %r isn't valid JSON - indexing it without any references.", path)
+                refs = []
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256, "refs": refs}
+
+
+def filter_affected_strands(strands, changed_paths, index_path=DEFAULT_INDEX_PATH):
+    """Update the dependency index for the given strands and return only those affected by the changed files.
+
+    :param iter(dict) strands: the strands to filter, each as a dictionary with `account`, `name`, and `path` keys
+    :param iter(str) changed_paths: the paths of the changed files
+    :param str index_path: the path of the dependency index file
+    :return list(dict): the affected strands
+    """
+    strands = list(strands)
+    index = DependencyIndex(index_path)
+    index.update(strands)
+    index.save()
+
+    affected_suids = set(index.get_affected_strands(changed_paths))
+    affected_strands = [strand for strand in strands if f"{strand['account']}/{strand['name']}" in affected_suids]
+    logger.info("%d of %d strands are affected by the changed files.", len(affected_strands), len(strands))
+    return affected_strands
+
+
+def _get_local_refs(json_schema, directory):
+    """Get the local files referenced by `$ref`s anywhere in a JSON schema. References to remote schemas and to
+    locations within the same schema are ignored.
+
+    :param any json_schema: the JSON schema (or part of it)
+    :param str directory: the directory relative references are resolved against
+    :return set(str): the absolute paths of the referenced files
+    """
+    refs = set()
+    to_visit = [json_schema]
+
+    while to_visit:
+        node = to_visit.pop()
+
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+
+            if isinstance(ref, str) and "://" not in ref:
+                ref_path = ref.split("#", 1)[0]
+
+                if ref_path:
+                    refs.add(os.path.abspath(os.path.join(directory, ref_path)))
+
+            to_visit.extend(node.values())
+
+        elif isinstance(node, list):
+            to_visit.extend(node)
+
+    return refs
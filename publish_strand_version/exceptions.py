@@ -1,2 +1,10 @@
 class StrandsException(Exception):
     pass
+
+
+class StalePlanError(StrandsException):
+    pass
+
+
+class CassetteError(StrandsException):
+    pass
@@ -0,0 +1,270 @@
+import json
+import logging
+import queue
+import threading
+
+from gql.transport.exceptions import TransportError
+import requests
+import semver
+
+from publish_strand_version.api import (
+    STRANDS_FRONTEND_URL,
+    STRANDS_SCHEMA_REGISTRY_URL,
+    _create_strand_version,
+    _suggest_sem_ver,
+)
+from publish_strand_version.exceptions import StrandsException
+from publish_strand_version.plan import _get_token, _load_schema
+
+DEFAULT_QUEUE_SIZE = 16
+
+# Failures of requests to Strands for a single strand, which are recorded in that strand's result.
+REQUEST_EXCEPTIONS = (StrandsException, TransportError, requests.exceptions.RequestException)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def run_pipeline(token, strands, output_path, allow_beta=True, suggest_only=False, queue_size=DEFAULT_QUEUE_SIZE):
+    """Publish new strand versions (or just suggest their semantic versions) for any number of strands, streaming the
+    result for each strand to a JSON Lines file as soon as it's available. Peak memory use doesn't depend on the number
+    of strands (see `iter_results`).
+
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of strand unique identifiers (SUIDs) to tokens
+    :param iter(dict) strands: the strands, each as a dictionary with `account`, `name`, and `path` keys and optional `version` and `notes` keys
+    :param str output_path: the path of the JSON Lines file to write the results to
+    :param bool allow_beta: if `False` and the base version is a beta version (< 1.0.0), interpret major/breaking changes as increasing the version to the lowest non-beta version (1.0.0)
+    :param bool suggest_only: if `True`, just get the suggested new versions
+    :param int queue_size: the maximum number of loaded schemas waiting for their version suggestion at any one time
+    :return dict: the number of strands that were published, skipped, and failed
+    """
+    summary = {"published": 0, "skipped": 0, "failed": 0}
+
+    with open(output_path, "w") as f:
+        for result in iter_results(
+            token, strands, allow_beta=allow_beta, suggest_only=suggest_only, queue_size=queue_size
+        ):
+            f.write(json.dumps(result) + "\n")
+
+            if result["error"]:
+                summary["failed"] += 1
+            elif result["published"]:
+                summary["published"] += 1
+            else:
+                summary["skipped"] += 1
+
+    logger.info(
+        "Finished: %d published, %d skipped, %d failed.",
+        summary["published"],
+        summary["skipped"],
+        summary["failed"],
+    )
+
+    return summary
+
+
+def iter_results(token, strands, allow_beta=True, suggest_only=False, queue_size=DEFAULT_QUEUE_SIZE):
+    """Publish new strand versions (or just suggest their semantic versions) for any number of strands, yielding the
+    result for each strand in order. Strands are processed in a pipeline of generators (load -> serialise -> suggest ->
+    create) so each schema is only held in memory until its result is yielded. Loading and serialising run in a
+    background thread and are kept at most `queue_size` schemas ahead of the requests to Strands, which are sent one at
+    a time. A failure for one strand is recorded in its result rather than stopping the pipeline.
+
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of strand unique identifiers (SUIDs) to tokens
+    :param iter(dict) strands: the strands, each as a dictionary with `account`, `name`, and `path` keys and optional `version` and `notes` keys
+    :param bool allow_beta: if `False` and the base version is a beta version (< 1.0.0), interpret major/breaking changes as increasing the version to the lowest non-beta version (1.0.0)
+    :param bool suggest_only: if `True`, just get the suggested new versions
+    :param int queue_size: the maximum number of loaded schemas waiting for their version suggestion at any one time
+    :return iter(dict): the result for each strand
+    """
+    prepared = _buffer(_serialise(_load(strands, suggest_only=suggest_only)), maxsize=queue_size)
+    suggested = _suggest(prepared, token=token, allow_beta=allow_beta)
+    yield from _create(suggested, token=token, suggest_only=suggest_only)
+
+
+def _load(strands, suggest_only=False):
+    """Load the JSON schema for each strand, recording an error in the strand's result if its schema can't be loaded
+    or its version is invalid (or set at all when only suggesting versions).
+
+    :param iter(dict) strands: the strands
+    :param bool suggest_only: if `True`, the strands are only getting suggested versions
+    :return iter(dict): a pipeline item for each strand
+    """
+    for strand in strands:
+        suid = f"{strand['account']}/{strand['name']}"
+
+        item = {
+            "suid": suid,
+            "version": strand.get("version"),
+            "notes": strand.get("notes"),
+            "json_schema": None,
+            "result": {
+                "account": strand["account"],
+                "name": strand["name"],
+                "path": strand["path"],
+                "strand_url": "/".join((STRANDS_FRONTEND_URL, suid)),
+                "strand_version_url": "",
+                "strand_version_uuid": "",
+                "version": "",
+                "published": False,
+                "change": "",
+                "latest_version": "",
+                "stable_version": "",
+                "error": None,
+            },
+        }
+
+        if item["version"] and not semver.Version.is_valid(item["version"]):
+            item["result"]["error"] = f"{item['version']!r} isn't a valid semantic version."
+            yield item
+            continue
+
+        if item["version"] and suggest_only:
+            item["result"]["error"] = "A version cannot be set for a strand while `suggest_only=True`."
+            yield item
+            continue
+
+        # The schema is only referenced from the item so it's released as soon as a later stage drops it.
+        try:
+            item["json_schema"] = _load_schema(strand["path"])
+        except (OSError, ValueError) as e:
+            item["result"]["error"] = f"Failed to load schema: {e}"
+
+        yield item
+
+
+def _serialise(items):
+    """Serialise each item's JSON schema to a canonical (key-sorted, compact) JSON string.
+
+    :param iter(dict) items: the pipeline items
+    :return iter(dict): the pipeline items with their serialised schemas added
+    """
+    for item in items:
+        if item["json_schema"] is not None:
+            item["proposed"] = json.dumps(item["json_schema"], sort_keys=True, separators=(",", ":"))
+
+        yield item
+
+
+def _suggest(items, token, allow_beta):
+    """Get the suggested semantic version for each item, dropping its serialised schema.
+
+    :param iter(dict) items: the pipeline items
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of SUIDs to tokens
+    :param bool allow_beta: if `False` and the base version is a beta version (< 1.0.0), interpret major/breaking changes as increasing the version to the lowest non-beta version (1.0.0)
+    :return iter(dict): the pipeline items with the suggestions added to their results
+    """
+    for item in items:
+        result = item["result"]
+
+        if result["error"]:
+            yield item
+            continue
+
+        try:
+            suggested_version, changed, change, latest_version, stable_version = _suggest_sem_ver(
+                token=_get_token(token, item["suid"]),
+                base=item["suid"],
+                proposed=item.pop("proposed"),
+                allow_beta=allow_beta,
+            )
+        except REQUEST_EXCEPTIONS as e:
+            result["error"] = str(e)
+            yield item
+            continue
+
+        item["changed"] = changed
+        result.update(change=change, latest_version=latest_version, stable_version=stable_version)
+        result["version"] = item["version"] or suggested_version
+        yield item
+
+
+def _create(items, token, suggest_only):
+    """Create a strand version for each item that needs one, dropping its schema.
+
+    :param iter(dict) items: the pipeline items
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of SUIDs to tokens
+    :param bool suggest_only: if `True`, don't create any strand versions
+    :return iter(dict): the result for each item
+    """
+    for item in items:
+        result = item["result"]
+
+        if result["error"] or suggest_only or not (item["version"] or item["changed"]):
+            item.pop("json_schema")
+            yield result
+            continue
+
+        try:
+            result["strand_version_uuid"] = _create_strand_version(
+                token=_get_token(token, item["suid"]),
+                account=result["account"],
+                name=result["name"],
+                json_schema=item.pop("json_schema"),
+                version=result["version"],
+                notes=item["notes"],
+            )
+        except REQUEST_EXCEPTIONS as e:
+            result["error"] = str(e)
+        else:
+            result["published"] = True
+            result["strand_version_url"] = "/".join(
+                (STRANDS_SCHEMA_REGISTRY_URL, item["suid"], f"{result['version']}.json")
+            )
+
+        yield result
+
+
+def _buffer(iterator, maxsize):
+    """Consume an iterator in a background thread, holding at most `maxsize` of its items in a queue until they're
+    used. The background thread blocks while the queue is full, so it never runs more than `maxsize` items ahead.
+    Exceptions raised by the iterator are re-raised when the item they replace would have been used.
+
+    :param iter iterator: the iterator to consume
+    :param int maxsize: the maximum number of items to hold
+    :return iter: the items of the iterator
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+
+        except BaseException as e:
+            put(e)
+            return
+
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+
+            if item is _DONE:
+                return
+
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+
+from publish_strand_version.api import (
+    STRANDS_FRONTEND_URL,
+    STRANDS_SCHEMA_REGISTRY_URL,
+    _create_strand_version,
+    _suggest_sem_ver,
+)
+from publish_strand_version.exceptions import StalePlanError
+
+PLAN_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def plan_strand_versions(token, strands, allow_beta=True):
+    """Get the suggested semantic version for one or more strands and record everything needed to publish them later
+    in a plan. No strand versions are published.
+
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of strand unique identifiers (SUIDs) to tokens
+    :param iter(dict) strands: the strands to plan for, each as a dictionary with `account`, `name`, and `path` keys and optional `version` and `notes` keys
+    :param bool allow_beta: if `False` and the base version is a beta version (< 1.0.0), interpret major/breaking changes as increasing the version to the lowest non-beta version (1.0.0)
+    :raises OSError: if a schema can't be read
+    :raises ValueError: if a schema isn't valid JSON
+    :return dict: the plan
+    """
+    entries = []
+
+    for strand in strands:
+        suid = f"{strand['account']}/{strand['name']}"
+        json_schema = _load_schema(strand["path"])
+
+        suggested_version, changed, change, latest_version, stable_version = _suggest_sem_ver(
+            token=_get_token(token, suid),
+            base=suid,
+            proposed=json.dumps(json_schema),
+            allow_beta=allow_beta,
+        )
+
+        if strand.get("version"):
+            version = strand["version"]
+            publish = True
+        else:
+            version = suggested_version
+            publish = changed
+
+        entries.append(
+            {
+                "account": strand["account"],
+                "name": strand["name"],
+                "path": strand["path"],
+                "fingerprint": fingerprint_schema(json_schema),
+                "version": version,
+                "notes": strand.get("notes"),
+                "change": change,
+                "latest_version": latest_version,
+                "stable_version": stable_version,
+                "publish": publish,
+            }
+        )
+
+        logger.info("Planned %r: version %s (%s change, publish=%s).", suid, version, change, publish)
+
+    return {"format_version": PLAN_FORMAT_VERSION, "allow_beta": allow_beta, "strands": entries}
+
+
+def apply_plan(token, plan):
+    """Publish the strand versions recorded in a plan without requesting any further version suggestions. Every
+    schema is checked against its recorded fingerprint before anything is published. Strand versions published
+    elsewhere since the plan was made can't be detected without another version suggestion, so they're only caught by
+    Strands when the clashing strand version is created - this fails with a `StrandsException` and leaves any strands
+    earlier in the plan published.
+
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of strand unique identifiers (SUIDs) to tokens
+    :param dict plan: a plan created by `plan_strand_versions`
+    :raises publish_strand_version.exceptions.StalePlanError: if any schema has changed or can no longer be read since the plan was made or the plan's format isn't supported
+    :return list(tuple(str, str, str, str, bool, str, str, str)): for each strand in the plan, the strand URL, strand version URL (empty if not published), strand version UUID (empty if not published), semantic version, whether the strand version was published, change type, latest version, and stable version
+    """
+    if plan.get("format_version") != PLAN_FORMAT_VERSION:
+        raise StalePlanError(
+            f"Plans with format version {plan.get('format_version')!r} are not supported (expected {PLAN_FORMAT_VERSION})."
+        )
+
+    schemas = [_check_entry(entry) for entry in plan["strands"]]
+    results = []
+
+    for entry, json_schema in zip(plan["strands"], schemas):
+        suid = f"{entry['account']}/{entry['name']}"
+        strand_url = "/".join((STRANDS_FRONTEND_URL, suid))
+
+        if not entry["publish"]:
+            logger.info("Nothing to publish for %r - skipping.", suid)
+
+            results.append(
+                (
+                    strand_url,
+                    "",
+                    "",
+                    entry["version"],
+                    False,
+                    entry["change"],
+                    entry["latest_version"],
+                    entry["stable_version"],
+                )
+            )
+            continue
+
+        strand_version_uuid = _create_strand_version(
+            token=_get_token(token, suid),
+            account=entry["account"],
+            name=entry["name"],
+            json_schema=json_schema,
+            version=entry["version"],
+            notes=entry["notes"],
+        )
+
+        strand_version_url = "/".join((STRANDS_SCHEMA_REGISTRY_URL, suid, f"{entry['version']}.json"))
+
+        results.append(
+            (
+                strand_url,
+                strand_version_url,
+                strand_version_uuid,
+                entry["version"],
+                True,
+                entry["change"],
+                entry["latest_version"],
+                entry["stable_version"],
+            )
+        )
+
+    return results
+
+
+def fingerprint_schema(json_schema):
+    """Get a fingerprint of a JSON schema that's independent of key order and whitespace.
+
+    :param dict json_schema: the JSON schema to fingerprint
+    :return str: the SHA-256 hex digest of the canonically-serialised schema
+    """
+    canonical = json.dumps(json_schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def write_plan(plan, path):
+    """Write a plan to a JSON file.
+
+    :param dict plan: the plan to write
+    :param str path: the path to write the plan to
+    :return None:
+    """
+    with open(path, "w") as f:
+        json.dump(plan, f, indent=4)
+
+
+def read_plan(path):
+    """Read a plan from a JSON file.
+
+    :param str path: the path of the plan
+    :return dict: the plan
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def _check_entry(entry):
+    """Check that a plan entry's schema hasn't changed since the plan was made, loading the schema in the process.
+
+    :param dict entry: the plan entry to check
+    :raises publish_strand_version.exceptions.StalePlanError: if the schema has changed or can no longer be read since the plan was made
+    :return dict: the JSON schema for the entry
+    """
+    suid = f"{entry['account']}/{entry['name']}"
+
+    try:
+        json_schema = _load_schema(entry["path"])
+    except (OSError, ValueError) as e:
+        raise StalePlanError(f"The schema at {entry['path']!r} for {suid!r} can no longer be read: {e}") from e
+
+    if fingerprint_schema(json_schema) != entry["fingerprint"]:
+        raise StalePlanError(f"The schema at {entry['path']!r} for {suid!r} has changed since the plan was made.")
+
+    return json_schema
+
+
+def _load_schema(path):
+    """Load a JSON schema from a file.
+
+    :param str path: the path of the JSON schema
+    :return dict: the JSON schema
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def _get_token(token, suid):
+    """Get the token to use for a strand.
+
+    :param str|dict token: a Strands access token to use for every strand, or a mapping of strand unique identifiers (SUIDs) to tokens
+    :param str suid: the strand unique identifier (SUID) of the strand
+    :return str: the token to use for the strand
+    """
+    if isinstance(token, dict):
+        return token[suid]
+
+    return token
@@ -0,0 +1,340 @@
+import copy
+import json
+import uuid
+
+from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.transport import Transport
+from graphql import ExecutionResult
+from graphql.utilities import get_operation_ast
+import semver
+
+from publish_strand_version.exceptions import CassetteError
+
+TRANSPORT_MODES = {"live", "record", "replay", "fake"}
+REDACTED = "<redacted>"
+REDACTED_VARIABLES = {"token"}
+JSON_ENCODED_VARIABLES = {"proposed"}
+UNRECORDED_OPERATIONS = {"IntrospectionQuery"}
+
+
+def make_transport(mode, url, cassette_path=None):
+    """Make a GraphQL transport for the given mode.
+
+    :param str mode: one of "live" (send requests to the Strands API), "record" (send requests to the Strands API and record them in a cassette), "replay" (serve responses from a cassette), or "fake" (serve responses from an in-memory fake of the Strands API)
+    :param str url: the URL of the Strands GraphQL API
+    :param str|None cassette_path: the path of the cassette to record to or replay from (required for the "record" and "replay" modes)
+    :raises ValueError: if the mode isn't recognised or a cassette path is required but not given
+    :return gql.transport.transport.Transport: the transport
+    """
+    if mode not in TRANSPORT_MODES:
+        raise ValueError(f"{mode!r} isn't a valid transport mode. Choose from {sorted(TRANSPORT_MODES)!r}.")
+
+    if mode in {"record", "replay"} and not cassette_path:
+        raise ValueError(f"A cassette path is required for the {mode!r} transport mode.")
+
+    if mode == "live":
+        return RequestsHTTPTransport(url=url)
+
+    if mode == "record":
+        return RecordingTransport(RequestsHTTPTransport(url=url), cassette_path)
+
+    if mode == "replay":
+        return ReplayTransport(cassette_path)
+
+    return FakeStrandsTransport()
+
+
+class RecordingTransport(Transport):
+    """A transport that sends requests through another transport and appends each request/response pair to a JSON
+    Lines cassette file. Variables that contain secrets (e.g. tokens) are redacted before being recorded. Schema
+    introspection queries aren't recorded as they're never sent when replaying.
+
+    :param gql.transport.transport.Transport transport: the transport to send requests through
+    :param str cassette_path: the path of the cassette to record to (any existing interactions in it are kept)
+    :return None:
+    """
+
+    def __init__(self, transport, cassette_path):
+        self.transport = transport
+        self.cassette_path = cassette_path
+
+    def connect(self):
+        self.transport.connect()
+
+    def close(self):
+        self.transport.close()
+
+    def execute(self, document, variable_values=None, operation_name=None, **kwargs):
+        """Execute the request through the wrapped transport and record the interaction.
+
+        :param graphql.DocumentNode document: the GraphQL document to execute
+        :param dict|None variable_values: the variables for the document
+        :param str|None operation_name: the name of the operation in the document to execute
+        :return graphql.ExecutionResult: the result from the wrapped transport
+        """
+        result = self.transport.execute(
+            document,
+            variable_values=variable_values,
+            operation_name=operation_name,
+            **kwargs,
+        )
+
+        operation = _get_operation_name(document, operation_name)
+
+        if operation in UNRECORDED_OPERATIONS:
+            return result
+
+        interaction = {
+            "operation": operation,
+            "variables": _normalise_variables(variable_values),
+            "response": {"data": result.data, "errors": result.errors},
+        }
+
+        with open(self.cassette_path, "a") as f:
+            f.write(json.dumps(interaction) + "\n")
+
+        return result
+
+
+class ReplayTransport(Transport):
+    """A transport that serves responses from a cassette file recorded by `RecordingTransport` without opening any
+    sockets. Requests are matched by operation name and normalised variables. If the same request was recorded more
+    than once, the responses are served in the order they were recorded, with the last one repeated once the others
+    have been used.
+
+    :param str cassette_path: the path of the cassette to replay from
+    :return None:
+    """
+
+    def __init__(self, cassette_path):
+        self.cassette_path = cassette_path
+        self.responses = {}
+
+        for interaction in _read_cassette(cassette_path):
+            key = _make_key(interaction["operation"], _normalise_variables(interaction["variables"]))
+            self.responses.setdefault(key, []).append(interaction["response"])
+
+    def execute(self, document, variable_values=None, operation_name=None, **kwargs):
+        """Serve the recorded response for the request.
+
+        :param graphql.DocumentNode document: the GraphQL document to execute
+        :param dict|None variable_values: the variables for the document
+        :param str|None operation_name: the name of the operation in the document to execute
+        :raises publish_strand_version.exceptions.CassetteError: if the request wasn't recorded in the cassette
+        :return graphql.ExecutionResult: the recorded result
+        """
+        operation = _get_operation_name(document, operation_name)
+        responses = self.responses.get(_make_key(operation, _normalise_variables(variable_values)))
+
+        if not responses:
+            raise CassetteError(f"No recorded response for a {operation!r} request in {self.cassette_path!r}.")
+
+        if len(responses) > 1:
+            response = responses.pop(0)
+        else:
+            response = responses[0]
+
+        return ExecutionResult(data=copy.deepcopy(response["data"]), errors=response["errors"])
+
+
+class FakeStrandsTransport(Transport):
+    """A transport implementing the `suggestSemVerViaToken` and `createStrandVersionViaToken` mutations against an
+    in-memory fake of the Strands API.
+
+    The fake classifies changes between schemas simply: removing a property or requiring a new one is a major change,
+    adding a property is a minor change, and any other change is a patch.
+
+    :param bool create_missing_strands: if `True`, strands that haven't been added with `add_strand` are created (accepting any token) the first time they're used; otherwise, using them fails as it would with the Strands API
+    :return None:
+    """
+
+    def __init__(self, create_missing_strands=True):
+        self.create_missing_strands = create_missing_strands
+        self.strands = {}
+
+    def add_strand(self, account, name, token=None):
+        """Add an empty strand to the fake.
+
+        :param str account: the handle of the account the strand belongs to
+        :param str name: the name of the strand
+        :param str|None token: if given, the only token allowed to access the strand; otherwise, any token is allowed
+        :return None:
+        """
+        self.strands[f"{account}/{name}"] = {"token": token, "versions": {}}
+
+    def get_versions(self, account, name):
+        """Get the versions of a strand in the fake.
+
+        :param str account: the handle of the account the strand belongs to
+        :param str name: the name of the strand
+        :return dict: the strand's versions as a mapping of semantic version strings to dictionaries with `uuid`, `json_schema` and `notes` keys
+        """
+        return self.strands[f"{account}/{name}"]["versions"]
+
+    def execute(self, document, variable_values=None, operation_name=None, **kwargs):
+        """Execute the mutation against the fake.
+
+        :param graphql.DocumentNode document: the GraphQL document to execute
+        :param dict|None variable_values: the variables for the document
+        :param str|None operation_name: the name of the operation in the document to execute
+        :raises ValueError: if the operation isn't supported by the fake
+        :return graphql.ExecutionResult: the result
+        """
+        operation = _get_operation_name(document, operation_name)
+
+        if operation == "suggestSemVerViaToken":
+            return ExecutionResult(data={operation: self._suggest_sem_ver(**variable_values)})
+
+        if operation == "createStrandVersionViaToken":
+            return ExecutionResult(data={operation: self._create_strand_version(**variable_values)})
+
+        raise ValueError(f"The {operation!r} operation isn't supported by the fake Strands transport.")
+
+    def _get_strand(self, suid):
+        if suid not in self.strands and self.create_missing_strands:
+            self.strands[suid] = {"token": None, "versions": {}}
+
+        return self.strands.get(suid)
+
+    def _suggest_sem_ver(self, token, base, proposed, allowBeta):
+        strand = self._get_strand(base)
+
+        if strand is None:
+            return {"type": "NOT_FOUND", "message": f"Strand {base!r} not found."}
+
+        if not self._is_authorised(strand, token):
+            return _operation_info("Invalid token.")
+
+        proposed = json.loads(proposed)
+        versions = [semver.Version.parse(version) for version in strand["versions"]]
+
+        if not versions:
+            return {"suggestedVersion": "0.1.0", "change": "INITIAL", "latestVersion": None, "stableVersion": None}
+
+        latest_version = max(versions)
+        stable_versions = [version for version in versions if not version.prerelease]
+        stable_version = max(stable_versions) if stable_versions else None
+
+        change = _classify_change(strand["versions"][str(latest_version)]["json_schema"], proposed)
+        base_version = latest_version.finalize_version()
+
+        if change == "EQUAL":
+            suggested_version = latest_version
+        elif change == "MAJOR" and base_version.major == 0:
+            if allowBeta:
+                suggested_version = base_version.bump_minor()
+            else:
+                suggested_version = semver.Version(1, 0, 0)
+        else:
+            suggested_version = base_version.next_version(part=change.lower())
+
+        return {
+            "suggestedVersion": str(suggested_version),
+            "change": change,
+            "latestVersion": str(latest_version),
+            "stableVersion": str(stable_version) if stable_version else None,
+        }
+
+    def _create_strand_version(self, token, account, name, json_schema, major, minor, patch, candidate, notes):
+        strand = self._get_strand(f"{account}/{name}")
+
+        if strand is None or not self._is_authorised(strand, token):
+            return _operation_info("Invalid token.")
+
+        version = str(semver.Version(major, minor, patch, prerelease=candidate))
+
+        if version in strand["versions"]:
+            return _operation_info(f"Version {version} already exists.")
+
+        strand_version_uuid = str(uuid.uuid4())
+        strand["versions"][version] = {"uuid": strand_version_uuid, "json_schema": json_schema, "notes": notes}
+        return {"uuid": strand_version_uuid}
+
+    def _is_authorised(self, strand, token):
+        return strand["token"] is None or strand["token"] == token
+
+
+def _classify_change(base, proposed):
+    """Classify the change from a base schema to a proposed schema.
+
+    :param dict base: the base schema
+    :param dict proposed: the proposed schema
+    :return str: one of "EQUAL", "PATCH", "MINOR", or "MAJOR"
+    """
+    if base == proposed:
+        return "EQUAL"
+
+    base_properties = set(base.get("properties", {}))
+    proposed_properties = set(proposed.get("properties", {}))
+
+    if base_properties - proposed_properties or set(proposed.get("required", [])) - set(base.get("required", [])):
+        return "MAJOR"
+
+    if proposed_properties - base_properties:
+        return "MINOR"
+
+    return "PATCH"
+
+
+def _operation_info(message):
+    return {"messages": [{"kind": "PERMISSION", "message": message, "field": None, "code": None}]}
+
+
+def _get_operation_name(document, operation_name=None):
+    """Get the name of the operation that will be executed from a GraphQL document.
+
+    :param graphql.DocumentNode document: the GraphQL document
+    :param str|None operation_name: the name of the operation in the document to execute
+    :return str|None: the name of the operation
+    """
+    operation = get_operation_ast(document, operation_name)
+
+    if operation is None or operation.name is None:
+        return None
+
+    return operation.name.value
+
+
+def _normalise_variables(variable_values):
+    """Redact secrets from the variables of a request and re-serialise JSON-encoded variables (e.g. the proposed
+    schema) canonically so their key order and whitespace don't matter.
+
+    :param dict|None variable_values: the variables
+    :return dict: a normalised copy of the variables
+    """
+    normalised = {}
+
+    for name, value in (variable_values or {}).items():
+        if name in REDACTED_VARIABLES:
+            value = REDACTED
+        elif name in JSON_ENCODED_VARIABLES and isinstance(value, str):
+            try:
+                value = json.dumps(json.loads(value), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+            except ValueError:
+                pass
+
+        normalised[name] = value
+
+    return normalised
+
+
+def _make_key(operation, variables):
+    """Make a key for a request that's independent of the order of its variables.
+
+    :param str|None operation: the name of the operation
+    :param dict variables: the normalised variables
+    :return str: the key
+    """
+    return json.dumps([operation, variables], sort_keys=True)
+
+
+def _read_cassette(path):
+    """Read the interactions from a JSON Lines cassette file.
+
+    :param str path: the path of the cassette
+    :return iter(dict): the interactions
+    """
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
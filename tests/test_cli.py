@@ -1,9 +1,10 @@
 import os
+import tempfile
 import unittest
 from unittest.mock import mock_open, patch
 
 from publish_strand_version import cli
-from publish_strand_version.exceptions import StrandsException
+from publish_strand_version.exceptions import StalePlanError, StrandsException
 
 
 class TestCLI(unittest.TestCase):
@@ -145,3 +146,200 @@ class TestCLI(unittest.TestCase):
         message = mock_stdout.method_calls[0].args[0]
         self.assertIn("STRAND VERSION SUGGESTION SUCCEEDED", message)
         self.assertIn("https://strands.octue.com/some/strand", message)
+
+    def test_plan(self):
+        """Test that the `plan` command plans versions for each strand given and writes the plan to a file."""
+        plan = {
+            "format_version": 1,
+            "allow_beta": False,
+            "strands": [
+                {"account": "some", "name": "strand", "version": "0.2.0", "change": "minor", "publish": True},
+            ],
+        }
+
+        with patch("publish_strand_version.cli.plan_strand_versions", return_value=plan) as mock_plan_strand_versions:
+            with patch("publish_strand_version.cli.write_plan") as mock_write_plan:
+                with patch("sys.stdout") as mock_stdout:
+                    with self.assertRaises(SystemExit) as e:
+                        cli.main(
+                            [
+                                "plan",
+                                "some-token",
+                                "plan.json",
+                                "some/strand=schema.json",
+                                "some/other-strand=other/schema.json",
+                                "--allow-beta",
+                                "false",
+                            ]
+                        )
+
+        mock_plan_strand_versions.assert_called_with(
+            token="some-token",
+            strands=[
+                {"account": "some", "name": "strand", "path": "schema.json"},
+                {"account": "some", "name": "other-strand", "path": "other/schema.json"},
+            ],
+            allow_beta=False,
+        )
+
+        mock_write_plan.assert_called_with(plan, "plan.json")
+        self.assertEqual(e.exception.code, 0)
+
+        message = mock_stdout.method_calls[0].args[0]
+        self.assertIn("STRAND VERSION PLANNING SUCCEEDED", message)
+        self.assertIn("some/strand: 0.2.0 (minor, publish)", message)
+
+    def test_apply(self):
+        """Test that the `apply` command publishes the strand versions in the plan."""
+        with patch("publish_strand_version.cli.read_plan", return_value={"some": "plan"}):
+            with patch(
+                "publish_strand_version.cli.apply_plan",
+                return_value=[("strand-url", "strand-version-url", "some-uuid", "0.2.0", True, "minor", "0.1.0", "0.1.0")],
+            ) as mock_apply_plan:
+                with patch("sys.stdout") as mock_stdout:
+                    with self.assertRaises(SystemExit) as e:
+                        cli.main(["apply", "some-token", "plan.json"])
+
+        mock_apply_plan.assert_called_with(token="some-token", plan={"some": "plan"})
+        self.assertEqual(e.exception.code, 0)
+
+        message = mock_stdout.method_calls[0].args[0]
+        self.assertIn("STRAND VERSION APPLYING SUCCEEDED", message)
+        self.assertIn("strand-url: 0.2.0 (minor, published) strand-version-url", message)
+
+    def test_apply_with_stale_plan(self):
+        """Test that the exit code is 1 if the plan is stale."""
+        with patch("publish_strand_version.cli.read_plan", return_value={"some": "plan"}):
+            with patch(
+                "publish_strand_version.cli.apply_plan",
+                side_effect=StalePlanError("Stale plan raised for testing!"),
+            ):
+                with patch("sys.stderr") as mock_stderr:
+                    with self.assertLogs() as logging_context:
+                        with self.assertRaises(SystemExit) as e:
+                            cli.main(["apply", "some-token", "plan.json"])
+
+        self.assertEqual(e.exception.code, 1)
+        self.assertIn("Stale plan raised for testing!", logging_context.output[0])
+        self.assertIn("STRAND VERSION APPLYING FAILED.", mock_stderr.method_calls[0].args[0])
+
+    def test_plan_with_missing_schema(self):
+        """Test that the exit code is 1 if a schema can't be read."""
+        with patch("publish_strand_version.cli.write_plan") as mock_write_plan:
+            with patch("sys.stderr") as mock_stderr:
+                with self.assertLogs() as logging_context:
+                    with self.assertRaises(SystemExit) as e:
+                        cli.main(["plan", "some-token", "plan.json", "some/strand=missing.json"])
+
+        self.assertEqual(e.exception.code, 1)
+        mock_write_plan.assert_not_called()
+        self.assertIn("missing.json", logging_context.output[0])
+        self.assertIn("STRAND VERSION PLANNING FAILED.", mock_stderr.method_calls[0].args[0])
+
+    def test_plan_with_changed_files(self):
+        """Test that the `plan` command only plans for strands affected by the changed files when they're given."""
+        plan = {"format_version": 1, "allow_beta": True, "strands": []}
+        affected_strands = [{"account": "some", "name": "strand", "path": "schema.json"}]
+
+        with patch("publish_strand_version.cli.filter_affected_strands", return_value=affected_strands) as mock_filter:
+            with patch("publish_strand_version.cli.plan_strand_versions", return_value=plan) as mock_plan_strand_versions:
+                with patch("publish_strand_version.cli.write_plan"):
+                    with patch("sys.stdout"):
+                        with self.assertRaises(SystemExit) as e:
+                            cli.main(
+                                [
+                                    "plan",
+                                    "some-token",
+                                    "plan.json",
+                                    "some/strand=schema.json",
+                                    "some/other-strand=other/schema.json",
+                                    "--changed",
+                                    "common/units.json",
+                                    "--index",
+                                    "index.json",
+                                ]
+                            )
+
+        mock_filter.assert_called_with(
+            [
+                {"account": "some", "name": "strand", "path": "schema.json"},
+                {"account": "some", "name": "other-strand", "path": "other/schema.json"},
+            ],
+            changed_paths=["common/units.json"],
+            index_path="index.json",
+        )
+
+        mock_plan_strand_versions.assert_called_with(token="some-token", strands=affected_strands, allow_beta=True)
+        self.assertEqual(e.exception.code, 0)
+
+    def test_run(self):
+        """Test that the `run` command runs the pipeline for the strands given, including those listed in a file."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            strands_path = os.path.join(temporary_directory, "strands.txt")
+
+            with open(strands_path, "w") as f:
+                f.write("some/other-strand=other/schema.json\n")
+
+            with patch(
+                "publish_strand_version.cli.run_pipeline",
+                return_value={"published": 1, "skipped": 1, "failed": 0},
+            ) as mock_run_pipeline:
+                with patch("sys.stdout") as mock_stdout:
+                    with self.assertRaises(SystemExit) as e:
+                        cli.main(["run", "some-token", "results.jsonl", "some/strand=schema.json", f"@{strands_path}"])
+
+        self.assertEqual(
+            mock_run_pipeline.call_args.kwargs.pop("strands"),
+            [
+                {"account": "some", "name": "strand", "path": "schema.json"},
+                {"account": "some", "name": "other-strand", "path": "other/schema.json"},
+            ],
+        )
+
+        self.assertEqual(
+            mock_run_pipeline.call_args.kwargs,
+            {
+                "token": "some-token",
+                "output_path": "results.jsonl",
+                "allow_beta": True,
+                "suggest_only": False,
+                "queue_size": 16,
+            },
+        )
+
+        self.assertEqual(e.exception.code, 0)
+        self.assertIn("STRAND VERSION PUBLISHING SUCCEEDED", mock_stdout.method_calls[0].args[0])
+
+    def test_run_with_failures(self):
+        """Test that the exit code of the `run` command is 1 if any strand fails."""
+        with patch("publish_strand_version.cli.run_pipeline", return_value={"published": 0, "skipped": 0, "failed": 1}):
+            with patch("sys.stderr") as mock_stderr:
+                with self.assertRaises(SystemExit) as e:
+                    cli.main(["run", "some-token", "results.jsonl", "some/strand=schema.json", "--suggest-only", "true"])
+
+        self.assertEqual(e.exception.code, 1)
+        self.assertIn("STRAND VERSION SUGGESTION FAILED.", mock_stderr.method_calls[0].args[0])
+
+    def test_malformed_strand(self):
+        """Test that a usage error is reported for strands not given in the form `account/name=path`."""
+        for strand in ("some/strand", "strand=schema.json", "/strand=schema.json", "some/strand="):
+            with self.subTest(command="plan", strand=strand):
+                with patch("sys.stderr") as mock_stderr:
+                    with self.assertRaises(SystemExit) as e:
+                        cli.main(["plan", "some-token", "plan.json", strand])
+
+                self.assertEqual(e.exception.code, 2)
+                message = "".join(call.args[0] for call in mock_stderr.method_calls if call.args)
+                self.assertIn(f"invalid strand {strand!r}", message)
+
+    def test_malformed_strand_in_run_reported_before_anything_is_published(self):
+        """Test that the `run` command reports a malformed strand as a usage error before running the pipeline."""
+        with patch("publish_strand_version.cli.run_pipeline") as mock_run_pipeline:
+            with patch("sys.stderr") as mock_stderr:
+                with self.assertRaises(SystemExit) as e:
+                    cli.main(["run", "some-token", "results.jsonl", "some/strand=schema.json", "bad"])
+
+        self.assertEqual(e.exception.code, 2)
+        mock_run_pipeline.assert_not_called()
+        message = "".join(call.args[0] for call in mock_stderr.method_calls if call.args)
+        self.assertIn("invalid strand 'bad'", message)
@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from publish_strand_version.dependencies import DependencyIndex, filter_affected_strands
+
+
+class TestDependencyIndex(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = os.path.realpath(self.temporary_directory.name)
+        self.index_path = os.path.join(self.directory, "index.json")
+
+        self._write("common/units.json", {"type": "number"})
+        self._write("common/geometry.json", {"properties": {"length": {"$ref": "units.json"}}})
+        self._write("common/metadata.json", {"type": "object"})
+        self._write("turbine.json", {"properties": {"blade": {"$ref": "common/geometry.json#/properties/length"}}})
+        self._write(
+            "met-mast.json",
+            {
+                "properties": {
+                    "metadata": {"$ref": "common/metadata.json"},
+                    "local": {"$ref": "#/$defs/local"},
+                    "remote": {"$ref": "https://jsonschema.registry.octue.com/some/strand/1.0.0.json"},
+                },
+                "$defs": {"local": {"type": "string"}},
+            },
+        )
+
+        self.strands = [
+            {"account": "some", "name": "turbine", "path": self._path("turbine.json")},
+            {"account": "some", "name": "met-mast", "path": self._path("met-mast.json")},
+        ]
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _path(self, relative_path):
+        return os.path.join(self.directory, relative_path)
+
+    def _write(self, relative_path, json_schema):
+        os.makedirs(os.path.dirname(self._path(relative_path)), exist_ok=True)
+
+        with open(self._path(relative_path), "w") as f:
+            json.dump(json_schema, f)
+
+    def test_get_dependencies(self):
+        """Test that direct and indirect local references are followed and local fragments and remote references are
+        ignored.
+        """
+        index = DependencyIndex(self.index_path)
+        index.update(self.strands)
+
+        self.assertEqual(
+            index.get_dependencies(self._path("turbine.json")),
+            {self._path("common/geometry.json"), self._path("common/units.json")},
+        )
+
+        self.assertEqual(index.get_dependencies(self._path("met-mast.json")), {self._path("common/metadata.json")})
+
+    def test_get_affected_strands(self):
+        """Test that strands are affected by changes to their own schema or any file they depend on."""
+        index = DependencyIndex(self.index_path)
+        index.update(self.strands)
+
+        self.assertEqual(index.get_affected_strands([self._path("common/units.json")]), ["some/turbine"])
+        self.assertEqual(index.get_affected_strands([self._path("met-mast.json")]), ["some/met-mast"])
+        self.assertEqual(index.get_affected_strands([self._path("unrelated.json")]), [])
+
+        self.assertEqual(
+            index.get_affected_strands([self._path("common/metadata.json"), self._path("common/geometry.json")]),
+            ["some/met-mast", "some/turbine"],
+        )
+
+    def test_paths_resolved_against_working_directory(self):
+        """Test that files are matched regardless of whether their paths are given as absolute or relative paths."""
+        original_working_directory = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, original_working_directory)
+
+        index = DependencyIndex(self.index_path)
+        index.update([{**self.strands[0], "path": "turbine.json"}, self.strands[1]])
+
+        for changed_path in (self._path("common/units.json"), "./common/units.json", "common/../common/units.json"):
+            with self.subTest(changed_path=changed_path):
+                self.assertEqual(index.get_affected_strands([changed_path]), ["some/turbine"])
+
+        self.assertEqual(index.get_affected_strands(["./met-mast.json"]), ["some/met-mast"])
+        self.assertEqual(index.get_dependencies("./met-mast.json"), {self._path("common/metadata.json")})
+
+    def test_index_persisted(self):
+        """Test that the index can be saved and loaded."""
+        index = DependencyIndex(self.index_path)
+        index.update(self.strands)
+        index.save()
+
+        loaded_index = DependencyIndex(self.index_path)
+        self.assertEqual(loaded_index.files, index.files)
+        self.assertEqual(loaded_index.get_affected_strands([self._path("common/units.json")]), ["some/turbine"])
+
+    def test_incremental_update(self):
+        """Test that only changed files are parsed again and that changed references are picked up."""
+        index = DependencyIndex(self.index_path)
+        index.update(self.strands)
+        metadata_entry = index.files[self._path("common/metadata.json")]
+
+        # Make sure the modification time changes even on file systems with coarse timestamps.
+        time.sleep(0.01)
+        self._write("common/geometry.json", {"properties": {"name": {"$ref": "metadata.json"}}})
+        index.update(self.strands)
+
+        self.assertIs(index.files[self._path("common/metadata.json")], metadata_entry)
+        self.assertNotIn(self._path("common/units.json"), index.files)
+        self.assertEqual(index.get_affected_strands([self._path("common/units.json")]), [])
+
+        self.assertEqual(
+            index.get_affected_strands([self._path("common/metadata.json")]),
+            ["some/met-mast", "some/turbine"],
+        )
+
+    def test_missing_referenced_file(self):
+        """Test that references to missing files are still recorded as dependencies."""
+        self._write("turbine.json", {"$ref": "missing.json"})
+        index = DependencyIndex(self.index_path)
+        index.update(self.strands)
+        self.assertEqual(index.get_affected_strands([self._path("missing.json")]), ["some/turbine"])
+
+    def test_invalid_referenced_file(self):
+        """Test that a referenced file that isn't valid JSON is indexed without any references of its own."""
+        with open(self._path("common/units.json"), "w") as f:
+            f.write("not json {")
+
+        index = DependencyIndex(self.index_path)
+
+        with self.assertLogs(level="WARNING"):
+            index.update(self.strands)
+
+        self.assertEqual(index.files[self._path("common/units.json")]["refs"], [])
+        self.assertEqual(index.get_affected_strands([self._path("common/units.json")]), ["some/turbine"])
+
+    def test_filter_affected_strands(self):
+        """Test that only affected strands are returned and that the index is saved."""
+        affected_strands = filter_affected_strands(
+            self.strands,
+            changed_paths=[self._path("common/units.json")],
+            index_path=self.index_path,
+        )
+
+        self.assertEqual(affected_strands, [self.strands[0]])
+        self.assertTrue(os.path.exists(self.index_path))
@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import gql
+from gql.transport.exceptions import TransportQueryError
+import requests
+
+from publish_strand_version.pipeline import _buffer, iter_results, run_pipeline
+from publish_strand_version.transports import FakeStrandsTransport
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self.temporary_directory.name
+
+        self.transport = FakeStrandsTransport()
+        client_patcher = patch("publish_strand_version.api.client", gql.Client(transport=self.transport))
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+
+        self.strands = []
+
+        for i in range(5):
+            path = os.path.join(self.directory, f"schema-{i}.json")
+
+            with open(path, "w") as f:
+                json.dump({"properties": {"a": {"type": "integer"}}}, f)
+
+            self.strands.append({"account": "some", "name": f"strand-{i}", "path": path})
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_run_pipeline(self):
+        """Test that a result for each strand is streamed to the output file in order."""
+        output_path = os.path.join(self.directory, "results.jsonl")
+        summary = run_pipeline(token="some-token", strands=iter(self.strands), output_path=output_path, queue_size=2)
+
+        self.assertEqual(summary, {"published": 5, "skipped": 0, "failed": 0})
+
+        with open(output_path) as f:
+            results = [json.loads(line) for line in f]
+
+        self.assertEqual([result["name"] for result in results], [f"strand-{i}" for i in range(5)])
+
+        self.assertEqual(
+            results[0],
+            {
+                "account": "some",
+                "name": "strand-0",
+                "path": self.strands[0]["path"],
+                "strand_url": "https://strands.octue.com/some/strand-0",
+                "strand_version_url": "https://jsonschema.registry.octue.com/some/strand-0/0.1.0.json",
+                "strand_version_uuid": self.transport.get_versions("some", "strand-0")["0.1.0"]["uuid"],
+                "version": "0.1.0",
+                "published": True,
+                "change": "initial",
+                "latest_version": "",
+                "stable_version": "",
+                "error": None,
+            },
+        )
+
+        # Running again skips publishing as the schemas haven't changed.
+        summary = run_pipeline(token="some-token", strands=self.strands, output_path=output_path)
+        self.assertEqual(summary, {"published": 0, "skipped": 5, "failed": 0})
+
+    def test_suggest_only(self):
+        """Test that nothing is published in suggest-only mode."""
+        results = list(iter_results(token="some-token", strands=self.strands, suggest_only=True))
+        self.assertTrue(all(result["version"] == "0.1.0" and not result["published"] for result in results))
+        self.assertEqual(self.transport.get_versions("some", "strand-0"), {})
+
+    def test_manually_specified_version(self):
+        """Test that a manually specified version is published even if the schema hasn't changed."""
+        list(iter_results(token="some-token", strands=self.strands[:1]))
+        results = list(iter_results(token="some-token", strands=[{**self.strands[0], "version": "1.0.0"}]))
+
+        self.assertEqual(results[0]["version"], "1.0.0")
+        self.assertEqual(results[0]["change"], "equal")
+        self.assertTrue(results[0]["published"])
+
+    def test_failures_recorded_without_stopping_pipeline(self):
+        """Test that failures for individual strands are recorded in their results and the other strands still run."""
+        self.transport.add_strand("some", "strand-1", token="another-token")
+        strands = [
+            *self.strands[:3],
+            {"account": "some", "name": "missing", "path": os.path.join(self.directory, "missing.json")},
+        ]
+
+        results = list(iter_results(token="some-token", strands=strands))
+
+        self.assertIsNone(results[0]["error"])
+        self.assertIn("Invalid token.", results[1]["error"])
+        self.assertFalse(results[1]["published"])
+        self.assertIsNone(results[2]["error"])
+        self.assertIn("Failed to load schema", results[3]["error"])
+
+    def test_invalid_version_recorded_without_stopping_pipeline(self):
+        """Test that an invalid manually specified version is recorded in the strand's result without any requests
+        being sent for it.
+        """
+        strands = [self.strands[0], {**self.strands[1], "version": "abc"}, self.strands[2]]
+        results = list(iter_results(token="some-token", strands=strands))
+
+        self.assertEqual(results[1]["error"], "'abc' isn't a valid semantic version.")
+        self.assertNotIn("some/strand-1", self.transport.strands)
+        self.assertEqual([result["published"] for result in results], [True, False, True])
+
+    def test_version_with_suggest_only_recorded_without_stopping_pipeline(self):
+        """Test that a manually specified version in suggest-only mode is recorded as an error in the strand's result
+        without any requests being sent for it.
+        """
+        strands = [self.strands[0], {**self.strands[1], "version": "1.0.0"}, self.strands[2]]
+        results = list(iter_results(token="some-token", strands=strands, suggest_only=True))
+
+        self.assertEqual(results[1]["error"], "A version cannot be set for a strand while `suggest_only=True`.")
+        self.assertNotIn("some/strand-1", self.transport.strands)
+        self.assertEqual([result["version"] for result in results], ["0.1.0", "", "0.1.0"])
+
+    def test_transport_errors_recorded_without_stopping_pipeline(self):
+        """Test that transport and query errors for individual strands are recorded in their results."""
+        errors = {
+            "some/strand-1": requests.exceptions.ConnectionError("Connection refused for testing!"),
+            "some/strand-3": TransportQueryError("Query error for testing!"),
+        }
+
+        execute = self.transport.execute
+
+        def execute_or_fail(document, variable_values=None, **kwargs):
+            suid = variable_values.get("base") or f"{variable_values['account']}/{variable_values['name']}"
+
+            if suid in errors:
+                raise errors[suid]
+
+            return execute(document, variable_values=variable_values, **kwargs)
+
+        with patch.object(self.transport, "execute", side_effect=execute_or_fail):
+            results = list(iter_results(token="some-token", strands=self.strands))
+
+        self.assertEqual(len(results), 5)
+        self.assertIn("Connection refused for testing!", results[1]["error"])
+        self.assertIn("Query error for testing!", results[3]["error"])
+        self.assertEqual([result["published"] for result in results], [True, False, True, False, True])
+
+
+class TestBuffer(unittest.TestCase):
+    def test_items_yielded_in_order(self):
+        """Test that all items are yielded in order."""
+        self.assertEqual(list(_buffer(iter(range(100)), maxsize=3)), list(range(100)))
+
+    def test_backpressure(self):
+        """Test that the iterator isn't consumed more than `maxsize` items ahead of the consumer."""
+        produced = []
+
+        def produce():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        buffered = _buffer(produce(), maxsize=3)
+        next(buffered)
+
+        # Give the background thread time to run ahead if it were able to.
+        time.sleep(0.2)
+
+        # One item has been consumed, up to three are queued, and one more can be waiting to be queued.
+        self.assertLessEqual(len(produced), 5)
+        buffered.close()
+
+    def test_exceptions_reraised(self):
+        """Test that exceptions raised by the iterator are re-raised to the consumer."""
+
+        def produce():
+            yield 1
+            raise ValueError("Raised for testing!")
+
+        buffered = _buffer(produce(), maxsize=3)
+        self.assertEqual(next(buffered), 1)
+
+        with self.assertRaises(ValueError):
+            next(buffered)
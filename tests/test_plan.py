@@ -0,0 +1,245 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gql
+
+from publish_strand_version.api import _create_strand_version
+from publish_strand_version.exceptions import StalePlanError, StrandsException
+from publish_strand_version.plan import apply_plan, fingerprint_schema, plan_strand_versions, read_plan, write_plan
+from publish_strand_version.transports import FakeStrandsTransport
+
+
+class TestPlanStrandVersions(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.schema_path = os.path.join(self.temporary_directory.name, "schema.json")
+
+        with open(self.schema_path, "w") as f:
+            json.dump({"some": "schema"}, f)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_plan(self):
+        """Test that a plan records the suggested version, fingerprint, and version information for each strand."""
+        with patch(
+            "gql.Client.execute",
+            side_effect=[
+                {
+                    "suggestSemVerViaToken": {
+                        "suggestedVersion": "0.2.0",
+                        "change": "MINOR",
+                        "latestVersion": "0.1.0",
+                        "stableVersion": "0.1.0",
+                    }
+                },
+                {
+                    "suggestSemVerViaToken": {
+                        "suggestedVersion": "1.0.0",
+                        "change": "EQUAL",
+                        "latestVersion": "1.0.0",
+                        "stableVersion": "1.0.0",
+                    }
+                },
+            ],
+        ):
+            plan = plan_strand_versions(
+                token={"some/strand": "some-token", "some/other-strand": "another-token"},
+                strands=[
+                    {"account": "some", "name": "strand", "path": self.schema_path, "notes": "Some notes."},
+                    {"account": "some", "name": "other-strand", "path": self.schema_path},
+                ],
+            )
+
+        self.assertEqual(plan["format_version"], 1)
+        self.assertTrue(plan["allow_beta"])
+
+        self.assertEqual(
+            plan["strands"][0],
+            {
+                "account": "some",
+                "name": "strand",
+                "path": self.schema_path,
+                "fingerprint": fingerprint_schema({"some": "schema"}),
+                "version": "0.2.0",
+                "notes": "Some notes.",
+                "change": "minor",
+                "latest_version": "0.1.0",
+                "stable_version": "0.1.0",
+                "publish": True,
+            },
+        )
+
+        self.assertEqual(plan["strands"][1]["version"], "1.0.0")
+        self.assertEqual(plan["strands"][1]["change"], "equal")
+        self.assertFalse(plan["strands"][1]["publish"])
+
+    def test_plan_with_manually_specified_version(self):
+        """Test that a manually specified version is used and always published."""
+        with patch(
+            "gql.Client.execute",
+            return_value={
+                "suggestSemVerViaToken": {
+                    "suggestedVersion": "1.0.0",
+                    "change": "EQUAL",
+                    "latestVersion": "1.0.0",
+                    "stableVersion": "1.0.0",
+                }
+            },
+        ):
+            plan = plan_strand_versions(
+                token="some-token",
+                strands=[{"account": "some", "name": "strand", "path": self.schema_path, "version": "1.0.1"}],
+            )
+
+        self.assertEqual(plan["strands"][0]["version"], "1.0.1")
+        self.assertTrue(plan["strands"][0]["publish"])
+
+    def test_fingerprint_independent_of_key_order(self):
+        """Test that schema fingerprints don't depend on key order."""
+        self.assertEqual(fingerprint_schema({"a": 1, "b": [1, 2]}), fingerprint_schema({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(fingerprint_schema({"a": 1}), fingerprint_schema({"a": 2}))
+
+    def test_plan_round_trip(self):
+        """Test that a plan can be written to and read from a file."""
+        plan = {"format_version": 1, "allow_beta": True, "strands": []}
+        plan_path = os.path.join(self.temporary_directory.name, "plan.json")
+        write_plan(plan, plan_path)
+        self.assertEqual(read_plan(plan_path), plan)
+
+
+class TestApplyPlan(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.schema_path = os.path.join(self.temporary_directory.name, "schema.json")
+
+        with open(self.schema_path, "w") as f:
+            json.dump({"some": "schema"}, f)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _make_plan(self, **overrides):
+        entry = {
+            "account": "some",
+            "name": "strand",
+            "path": self.schema_path,
+            "fingerprint": fingerprint_schema({"some": "schema"}),
+            "version": "0.2.0",
+            "notes": None,
+            "change": "minor",
+            "latest_version": "0.1.0",
+            "stable_version": "0.1.0",
+            "publish": True,
+        }
+
+        entry.update(overrides)
+        return {"format_version": 1, "allow_beta": True, "strands": [entry]}
+
+    def test_apply(self):
+        """Test that applying a plan publishes the planned versions without requesting any version suggestions."""
+        expected_strand_version_uuid = "e75dd480-4bfa-4ae9-b5c0-853e9a114194"
+
+        with patch(
+            "gql.Client.execute",
+            return_value={"createStrandVersionViaToken": {"uuid": expected_strand_version_uuid}},
+        ) as mock_execute:
+            results = apply_plan(token="some-token", plan=self._make_plan())
+
+        self.assertEqual(mock_execute.call_count, 1)
+        self.assertEqual(mock_execute.call_args.kwargs["variable_values"]["json_schema"], {"some": "schema"})
+        self.assertEqual(mock_execute.call_args.kwargs["variable_values"]["minor"], 2)
+
+        self.assertEqual(
+            results,
+            [
+                (
+                    "https://strands.octue.com/some/strand",
+                    "https://jsonschema.registry.octue.com/some/strand/0.2.0.json",
+                    expected_strand_version_uuid,
+                    "0.2.0",
+                    True,
+                    "minor",
+                    "0.1.0",
+                    "0.1.0",
+                )
+            ],
+        )
+
+    def test_unchanged_strands_skipped(self):
+        """Test that strands without changes aren't published."""
+        plan = self._make_plan(version="0.1.0", change="equal", publish=False)
+
+        with patch("gql.Client.execute") as mock_execute:
+            results = apply_plan(token="some-token", plan=plan)
+
+        mock_execute.assert_not_called()
+        self.assertEqual(
+            results, [("https://strands.octue.com/some/strand", "", "", "0.1.0", False, "equal", "0.1.0", "0.1.0")]
+        )
+
+    def test_error_raised_if_schema_changed(self):
+        """Test that nothing is published if a schema has changed since the plan was made."""
+        with open(self.schema_path, "w") as f:
+            json.dump({"some": "other-schema"}, f)
+
+        with patch("gql.Client.execute") as mock_execute:
+            with self.assertRaises(StalePlanError):
+                apply_plan(token="some-token", plan=self._make_plan())
+
+        mock_execute.assert_not_called()
+
+    def test_error_raised_if_schema_no_longer_readable(self):
+        """Test that nothing is published if a schema has been deleted or made invalid since the plan was made."""
+        plan = self._make_plan()
+
+        with open(self.schema_path, "w") as f:
+            f.write("not json {")
+
+        with patch("gql.Client.execute") as mock_execute:
+            with self.assertRaises(StalePlanError):
+                apply_plan(token="some-token", plan=plan)
+
+            os.remove(self.schema_path)
+
+            with self.assertRaises(StalePlanError):
+                apply_plan(token="some-token", plan=plan)
+
+        mock_execute.assert_not_called()
+
+    def test_manually_specified_backport_version(self):
+        """Test that a manually specified version older than the latest version (e.g. a backport) can be applied."""
+        with patch(
+            "gql.Client.execute",
+            return_value={"createStrandVersionViaToken": {"uuid": "e75dd480-4bfa-4ae9-b5c0-853e9a114194"}},
+        ):
+            results = apply_plan(token="some-token", plan=self._make_plan(version="0.9.1", latest_version="1.0.0"))
+
+        self.assertEqual(results[0][3], "0.9.1")
+        self.assertTrue(results[0][4])
+
+    def test_version_published_elsewhere_caught_by_strands(self):
+        """Test that a planned version published elsewhere after planning is rejected when it's created."""
+        transport = FakeStrandsTransport()
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=transport)):
+            plan = plan_strand_versions(
+                token="some-token", strands=[{"account": "a", "name": "x", "path": self.schema_path}]
+            )
+            _create_strand_version(
+                token="some-token", account="a", name="x", json_schema={"some": "schema"}, version="0.1.0"
+            )
+
+            with self.assertRaises(StrandsException):
+                apply_plan(token="some-token", plan=plan)
+
+    def test_error_raised_for_unsupported_plan_format(self):
+        """Test that an error is raised if the plan's format version isn't supported."""
+        plan = self._make_plan()
+        plan["format_version"] = 0
+
+        with self.assertRaises(StalePlanError):
+            apply_plan(token="some-token", plan=plan)
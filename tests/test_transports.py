@@ -0,0 +1,226 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gql
+from gql.transport.transport import Transport
+from graphql import ExecutionResult
+
+from publish_strand_version import api
+from publish_strand_version.api import _create_strand_version, _suggest_sem_ver, publish_strand_version, set_transport
+from publish_strand_version.exceptions import CassetteError, StrandsException
+from publish_strand_version.transports import (
+    FakeStrandsTransport,
+    RecordingTransport,
+    ReplayTransport,
+    make_transport,
+)
+
+SUGGESTION = {"suggestedVersion": "0.2.0", "change": "MINOR", "latestVersion": "0.1.0", "stableVersion": "0.1.0"}
+
+
+class MockTransport(Transport):
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def execute(self, document, *args, **kwargs):
+        return ExecutionResult(data=self.responses.pop(0))
+
+
+class TestMakeTransport(unittest.TestCase):
+    def test_error_raised_for_invalid_mode(self):
+        """Test that an error is raised if the transport mode isn't recognised."""
+        with self.assertRaises(ValueError):
+            make_transport("invalid", url="https://api.strands.octue.com/graphql/")
+
+    def test_error_raised_if_cassette_path_missing(self):
+        """Test that an error is raised if no cassette path is given for the record and replay modes."""
+        for mode in ("record", "replay"):
+            with self.subTest(mode=mode):
+                with self.assertRaises(ValueError):
+                    make_transport(mode, url="https://api.strands.octue.com/graphql/")
+
+
+class TestRecordingAndReplayTransports(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cassette_path = os.path.join(self.temporary_directory.name, "cassette.jsonl")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_record_and_replay(self):
+        """Test that recorded interactions are redacted and can be replayed without the original transport."""
+        recording_transport = RecordingTransport(
+            MockTransport([{"suggestSemVerViaToken": SUGGESTION}]),
+            self.cassette_path,
+        )
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=recording_transport)):
+            recorded = _suggest_sem_ver(
+                token="secret-token", base="some/strand", proposed='{"some": "schema"}', allow_beta=True
+            )
+
+        with open(self.cassette_path) as f:
+            cassette = f.read()
+
+        self.assertNotIn("secret-token", cassette)
+        interaction = json.loads(cassette.splitlines()[0])
+        self.assertEqual(interaction["operation"], "suggestSemVerViaToken")
+        self.assertEqual(interaction["variables"]["token"], "<redacted>")
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=ReplayTransport(self.cassette_path))):
+            replayed = _suggest_sem_ver(
+                token="another-token", base="some/strand", proposed='{"some": "schema"}', allow_beta=True
+            )
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed, ("0.2.0", True, "minor", "0.1.0", "0.1.0"))
+
+    def test_repeated_requests_replayed_in_order(self):
+        """Test that responses recorded for the same request are replayed in order and the last one is repeated."""
+        recording_transport = RecordingTransport(
+            MockTransport(
+                [
+                    {"suggestSemVerViaToken": SUGGESTION},
+                    {"suggestSemVerViaToken": {**SUGGESTION, "change": "EQUAL", "latestVersion": "0.2.0"}},
+                ]
+            ),
+            self.cassette_path,
+        )
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=recording_transport)):
+            for _ in range(2):
+                _suggest_sem_ver(token="some-token", base="some/strand", proposed="{}", allow_beta=True)
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=ReplayTransport(self.cassette_path))):
+            changes = [
+                _suggest_sem_ver(token="some-token", base="some/strand", proposed="{}", allow_beta=True)[2]
+                for _ in range(3)
+            ]
+
+        self.assertEqual(changes, ["minor", "equal", "equal"])
+
+    def test_proposed_schema_normalised(self):
+        """Test that a request is replayed regardless of the key order and whitespace of its proposed schema."""
+        recording_transport = RecordingTransport(
+            MockTransport([{"suggestSemVerViaToken": SUGGESTION}]),
+            self.cassette_path,
+        )
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=recording_transport)):
+            _suggest_sem_ver(token="some-token", base="some/strand", proposed='{"b": 1, "a": [1, 2]}', allow_beta=True)
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=ReplayTransport(self.cassette_path))):
+            replayed = _suggest_sem_ver(
+                token="some-token", base="some/strand", proposed='{"a":[1,2],"b":1}', allow_beta=True
+            )
+
+        self.assertEqual(replayed[0], "0.2.0")
+
+    def test_interactions_appended(self):
+        """Test that recording to an existing cassette keeps its interactions and that introspection isn't recorded."""
+        for proposed in ("{}", '{"a": 1}'):
+            recording_transport = RecordingTransport(
+                MockTransport([{"__schema": {}}, {"suggestSemVerViaToken": SUGGESTION}]),
+                self.cassette_path,
+            )
+
+            recording_transport.execute(gql.gql("query IntrospectionQuery { __schema { description } }"))
+
+            with patch("publish_strand_version.api.client", gql.Client(transport=recording_transport)):
+                _suggest_sem_ver(token="some-token", base="some/strand", proposed=proposed, allow_beta=True)
+
+        with open(self.cassette_path) as f:
+            interactions = [json.loads(line) for line in f]
+
+        self.assertEqual([interaction["operation"] for interaction in interactions], ["suggestSemVerViaToken"] * 2)
+        self.assertEqual([interaction["variables"]["proposed"] for interaction in interactions], ["{}", '{"a":1}'])
+
+    def test_error_raised_for_unrecorded_request(self):
+        """Test that an error is raised if a request wasn't recorded in the cassette."""
+        open(self.cassette_path, "w").close()
+
+        with patch("publish_strand_version.api.client", gql.Client(transport=ReplayTransport(self.cassette_path))):
+            with self.assertRaises(CassetteError):
+                _suggest_sem_ver(token="some-token", base="some/strand", proposed="{}", allow_beta=True)
+
+
+class TestFakeStrandsTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = FakeStrandsTransport(create_missing_strands=False)
+        self.transport.add_strand("some", "strand", token="some-token")
+
+        client_patcher = patch("publish_strand_version.api.client", gql.Client(transport=self.transport))
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+
+    def _publish(self, json_schema, **kwargs):
+        return publish_strand_version(
+            token="some-token", account="some", name="strand", json_schema=json_schema, **kwargs
+        )
+
+    def test_publishing_sequence(self):
+        """Test publishing a sequence of strand versions through the fake."""
+        schema = {"properties": {"a": {"type": "integer"}}}
+        self.assertEqual(self._publish(schema)[3:6], ("0.1.0", True, "initial"))
+        self.assertEqual(self._publish(schema)[3:6], ("0.1.0", False, "equal"))
+
+        schema = {"properties": {"a": {"type": "number"}}}
+        self.assertEqual(self._publish(schema)[3:], ("0.1.1", True, "patch", "0.1.0", "0.1.0"))
+
+        schema = {"properties": {"a": {"type": "number"}, "b": {"type": "string"}}}
+        self.assertEqual(self._publish(schema)[3:6], ("0.2.0", True, "minor"))
+
+        schema = {"properties": {"b": {"type": "string"}}}
+        self.assertEqual(self._publish(schema, allow_beta=False)[3:6], ("1.0.0", True, "major"))
+
+        schema = {"properties": {"b": {"type": "string"}}, "required": ["b"]}
+        self.assertEqual(self._publish(schema)[3:6], ("2.0.0", True, "major"))
+
+        self.assertEqual(
+            list(self.transport.get_versions("some", "strand")), ["0.1.0", "0.1.1", "0.2.0", "1.0.0", "2.0.0"]
+        )
+
+    def test_candidate_versions(self):
+        """Test that candidate versions count towards the latest version but not the stable version."""
+        self._publish({})
+        self._publish({"properties": {"a": {}}}, version="1.0.0-rc.1")
+
+        suggestion = _suggest_sem_ver(token="some-token", base="some/strand", proposed="{}", allow_beta=True)
+        self.assertEqual(suggestion[3:], ("1.0.0-rc.1", "0.1.0"))
+
+    def test_error_raised_if_version_already_exists(self):
+        """Test that creating an existing version fails."""
+        self._publish({})
+
+        with self.assertRaises(StrandsException):
+            _create_strand_version(token="some-token", account="some", name="strand", json_schema={}, version="0.1.0")
+
+    def test_error_raised_for_invalid_token(self):
+        """Test that requests with the wrong token fail."""
+        with self.assertRaises(StrandsException):
+            _suggest_sem_ver(token="wrong-token", base="some/strand", proposed="{}", allow_beta=True)
+
+    def test_error_raised_for_unknown_strand(self):
+        """Test that suggesting a version for a strand that doesn't exist fails."""
+        with self.assertRaises(StrandsException):
+            _suggest_sem_ver(token="some-token", base="some/other-strand", proposed="{}", allow_beta=True)
+
+
+class TestSetTransport(unittest.TestCase):
+    def test_set_transport(self):
+        """Test that requests are sent through the transport given to `set_transport`."""
+        original_transport, original_client = api.transport, api.client
+        self.addCleanup(setattr, api, "client", original_client)
+        self.addCleanup(setattr, api, "transport", original_transport)
+
+        fake_transport = FakeStrandsTransport()
+        set_transport(fake_transport)
+
+        self.assertIs(api.transport, fake_transport)
+        self.assertEqual(
+            _suggest_sem_ver(token="any-token", base="some/strand", proposed="{}", allow_beta=True)[2], "initial"
+        )